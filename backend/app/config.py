@@ -51,6 +51,20 @@ except ImportError:
 
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Connection pool sizing per process, split between the sync engine and the
+# async engine used by the general chat routes. Each API worker can open up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW
+# connections; keep that times UVICORN_WORKERS under Postgres' max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "4"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "6"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "2"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Executions before a query becomes a server-side prepared statement.
+# Set to "none" behind PgBouncer in transaction mode, which cannot keep them.
+_db_prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "5").strip().lower()
+DB_PREPARE_THRESHOLD = None if _db_prepare_threshold in ("", "none") else int(_db_prepare_threshold)
 FRONTEND_HOST = os.getenv("FRONTEND_HOST")
 HOST = os.getenv("HOST")
 # Qdrant Configuration
@@ -88,6 +102,7 @@ CACHE_TTL_EMBEDDINGS = int(os.getenv("CACHE_TTL_EMBEDDINGS", "86400"))  # 24 hou
 CACHE_TTL_RESPONSES = int(os.getenv("CACHE_TTL_RESPONSES", "3600"))     # 1 hour
 CACHE_TTL_DOCUMENTS = int(os.getenv("CACHE_TTL_DOCUMENTS", "7200"))    # 2 hours
 CACHE_TTL_CHAT_HISTORY = int(os.getenv("CACHE_TTL_CHAT_HISTORY", "1800"))  # 30 minutes
+CACHE_TTL_SESSION_LIST = int(os.getenv("CACHE_TTL_SESSION_LIST", "300"))  # 5 minutes
 
 # AI Model Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
@@ -1,23 +1,62 @@
 from sqlalchemy import create_engine, asc, Index, text
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.pool import QueuePool
 from sqlalchemy import event
 from .models import User, UploadedFile, Base, Chat, GeneralChatSession, GeneralChatMessage
 import os
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_PREPARE_THRESHOLD
+)
 from app.utils.logger import log_info, log_error
 import time
 
 
+def _with_driver(url, driver):
+    """Map a postgresql:// URL onto the given DBAPI driver"""
+    if not url:
+        return url
+    scheme, sep, rest = url.partition("://")
+    return f"postgresql+{driver}{sep}{rest}" if scheme.startswith("postgresql") else url
+
+
+# psycopg 3 turns queries into server-side prepared statements once they have
+# run DB_PREPARE_THRESHOLD times on a connection, so the handlers' repeated
+# queries skip parsing and planning. Compiled SQL is already cached per engine.
 engine = create_engine(
-    DATABASE_URL,
+    _with_driver(DATABASE_URL, "psycopg"),
     poolclass=QueuePool,
-    pool_size=20,  
-    max_overflow=30,  
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,  # Fail fast instead of queueing forever when the pool is exhausted
     pool_pre_ping=True,  
-    pool_recycle=3600,  
+    pool_recycle=DB_POOL_RECYCLE,  
     echo=False,  # Set to True for SQL query logging
-    connect_args={"connect_timeout": 10}  # Add timeout to prevent hanging
+    connect_args={
+        "connect_timeout": 10,  # Add timeout to prevent hanging
+        "prepare_threshold": DB_PREPARE_THRESHOLD
+    }
+)
+
+
+_async_connect_args = {"timeout": 10}
+if DB_PREPARE_THRESHOLD is None:
+    # asyncpg caches prepared statements too; disable it along with the sync threshold
+    _async_connect_args["statement_cache_size"] = 0
+
+# Async engine for request handlers that await their queries instead of
+# blocking the event loop. Celery tasks and services keep the sync engine.
+async_engine = create_async_engine(
+    _with_driver(DATABASE_URL, "asyncpg"),
+    # Its own share of the connection budget: both pools live in every API worker
+    pool_size=DB_ASYNC_POOL_SIZE,
+    max_overflow=DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+    echo=False,
+    connect_args=_async_connect_args
 )
 
 # Create database indexes for performance
@@ -79,27 +118,183 @@ def receive_checkin(dbapi_connection, connection_record):
     log_info("Database connection checked in", context="database")
 
 
-_tables_created = False
+def _timestamptz_upgrade(table, column, required=True):
+    """Convert a naive UTC timestamp column to timestamptz, once.
+    Required columns also become NOT NULL DEFAULT now()."""
+    backfill = f"UPDATE {table} SET {column} = now() WHERE {column} IS NULL;" if required else ""
+    constraints = f""",
+                ALTER COLUMN {column} SET DEFAULT now(),
+                ALTER COLUMN {column} SET NOT NULL""" if required else ""
+    return f"""
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = '{table}' AND column_name = '{column}'
+              AND data_type = 'timestamp without time zone'
+        ) THEN
+            {backfill}
+            ALTER TABLE {table}
+                ALTER COLUMN {column} TYPE timestamptz USING {column} AT TIME ZONE 'UTC'{constraints};
+        END IF;
+    END $$;
+    """
 
-def ensure_tables_created():
-    """Lazy table creation - only creates tables on first call"""
-    global _tables_created
-    if not _tables_created:
+
+# Idempotent DDL for databases created before a model change.
+# create_all() only creates missing tables, so new indexes/columns on
+# existing tables are applied here.
+SCHEMA_UPGRADES = [
+    # Composite indexes replacing the single-column user_id / session_id indexes
+    "CREATE INDEX IF NOT EXISTS ix_gcs_user_updated ON general_chat_sessions (user_id, updated_at DESC)",
+    "DROP INDEX IF EXISTS ix_general_chat_sessions_user_id",
+    "CREATE INDEX IF NOT EXISTS ix_gcm_session_created ON general_chat_messages (session_id, created_at)",
+    "DROP INDEX IF EXISTS ix_general_chat_messages_session_id",
+    # Containment (@>) lookups on chat sources
+    "CREATE INDEX IF NOT EXISTS ix_chats_source_gin ON chats USING GIN (source jsonb_path_ops)",
+    # Unwrap sources previously stored as a JSON string holding encoded JSON.
+    # Rows are cast one at a time so a string that isn't valid JSON is left as is.
+    """
+    DO $$
+    DECLARE
+        r record;
+    BEGIN
+        FOR r IN
+            SELECT id, source #>> '{}' AS raw FROM chats
+            WHERE jsonb_typeof(source) = 'string'
+              AND left(ltrim(source #>> '{}'), 1) IN ('[', '{')
+        LOOP
+            BEGIN
+                UPDATE chats SET source = r.raw::jsonb WHERE id = r.id;
+            EXCEPTION WHEN invalid_text_representation THEN
+                NULL;
+            END;
+        END LOOP;
+    END $$;
+    """,
+    # Denormalized per-session message counter, backfilled once when the column is added
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'general_chat_sessions' AND column_name = 'message_count'
+        ) THEN
+            ALTER TABLE general_chat_sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0;
+            UPDATE general_chat_sessions s
+            SET message_count = (SELECT count(*) FROM general_chat_messages m WHERE m.session_id = s.id);
+        END IF;
+    END $$;
+    """,
+    # Let the database cascade session deletes to their messages
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conname = 'general_chat_messages_session_id_fkey' AND confdeltype <> 'c'
+        ) THEN
+            ALTER TABLE general_chat_messages
+                DROP CONSTRAINT general_chat_messages_session_id_fkey,
+                ADD CONSTRAINT general_chat_messages_session_id_fkey
+                    FOREIGN KEY (session_id) REFERENCES general_chat_sessions(id) ON DELETE CASCADE;
+        END IF;
+    END $$;
+    """,
+    # Timezone-aware, non-null timestamps with server defaults
+    _timestamptz_upgrade("general_chat_sessions", "created_at"),
+    _timestamptz_upgrade("general_chat_sessions", "updated_at"),
+    _timestamptz_upgrade("general_chat_messages", "created_at"),
+    _timestamptz_upgrade("chats", "created_at_question"),
+    _timestamptz_upgrade("chats", "created_at_response", required=False),
+    # Bounded message content, kept out of line without pglz compression attempts
+    f"""
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'general_chat_messages' AND column_name = 'content'
+              AND data_type = 'character varying'
+        ) THEN
+            ALTER TABLE general_chat_messages ALTER COLUMN content TYPE text;
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_gcm_content_length') THEN
+            ALTER TABLE general_chat_messages
+                ADD CONSTRAINT ck_gcm_content_length
+                CHECK (length(content) <= {GeneralChatMessage.MAX_CONTENT_LENGTH}) NOT VALID;
+        END IF;
+    END $$;
+    """,
+    # SET STORAGE takes an ACCESS EXCLUSIVE lock, so only issue it when needed
+    """
+    DO $$
+    BEGIN
+        IF (
+            SELECT attstorage FROM pg_attribute
+            WHERE attrelid = 'general_chat_messages'::regclass AND attname = 'content'
+        ) <> 'e' THEN
+            ALTER TABLE general_chat_messages ALTER COLUMN content SET STORAGE EXTERNAL;
+        END IF;
+    END $$;
+    """,
+]
+
+
+def apply_schema_upgrades(connection):
+    """
+    Apply idempotent schema upgrades to existing tables.
+    Each upgrade runs in its own transaction so one failure doesn't roll back
+    the others; any failure is raised once all of them have been tried.
+    """
+    failed = 0
+    for statement in SCHEMA_UPGRADES:
         try:
-            Base.metadata.create_all(bind=engine)
-            _tables_created = True
-            log_info("Database tables created/verified", context="database")
+            with connection.begin():
+                connection.execute(text(statement))
         except Exception as e:
+            failed += 1
+            log_error(e, context="database_schema_upgrades", statement=statement.strip()[:200])
+    
+    if failed:
+        raise RuntimeError(f"{failed} of {len(SCHEMA_UPGRADES)} database schema upgrades failed")
+    log_info("Database schema upgrades applied", context="database")
+
 
-            log_error(e, context="database_table_creation", message="Failed to create tables (will retry on first use)")
+# Session-level advisory lock key serializing schema setup across worker processes
+SCHEMA_SETUP_LOCK_KEY = 0x4E375343
+
+_tables_created = False
+
+def ensure_tables_created():
+    """
+    Create missing tables and apply schema upgrades, once per process.
+    Run from application startup; it is not retried from the request path.
+    """
+    global _tables_created
+    if _tables_created:
+        return
+    try:
+        with engine.connect() as connection:
+            # Workers starting together would otherwise race through the same
+            # check-then-ALTER upgrades; the others wait and find them applied
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_SETUP_LOCK_KEY})
+            connection.commit()
+            try:
+                Base.metadata.create_all(bind=connection)
+                connection.commit()
+                apply_schema_upgrades(connection)
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_SETUP_LOCK_KEY})
+                connection.commit()
+        _tables_created = True
+        log_info("Database tables created/verified", context="database")
+    except Exception as e:
+        log_error(e, context="database_table_creation", message="Failed to create or upgrade tables")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     """Database dependency with connection monitoring"""
-    # Ensure tables are created on first database access
-    ensure_tables_created()
-    
     db = SessionLocal()
     start_time = time.time()
     
@@ -114,6 +309,26 @@ def get_db():
             log_info(f"Slow database session: {duration:.3f}s", context="database")
         db.close()
 
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+async def get_async_db():
+    """
+    Async database dependency with connection monitoring.
+    Tables are set up at application startup: schema setup is blocking DDL
+    and must not run on the event loop.
+    """
+    start_time = time.time()
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            log_error(e, context="database_session")
+            raise
+        finally:
+            duration = time.time() - start_time
+            if duration > 1.0:  # Log slow database sessions
+                log_info(f"Slow database session: {duration:.3f}s", context="database")
+
 def get_db_stats():
     """Get database connection pool statistics"""
     pool = engine.pool
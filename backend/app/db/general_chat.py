@@ -0,0 +1,51 @@
+"""
+Shared persistence for general chat turns.
+Written against the sync Session; async callers run it through AsyncSession.run_sync().
+"""
+from typing import List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from .models import GeneralChatSession, GeneralChatMessage
+
+
+def save_general_chat_turn(
+    db: Session,
+    session_id: int,
+    user_id: int,
+    messages: List[dict],
+    title: Optional[str] = None
+):
+    """
+    Save a turn's messages with a single multi-row INSERT ... RETURNING and update the
+    session counters in the same transaction. Messages must share the same keys to be
+    sent as one statement. The caller commits.
+    Returns the (id, created_at) rows in message order, or None if the session is gone.
+    """
+    values = {"message_count": GeneralChatSession.message_count + len(messages)}
+    if title:
+        values["title"] = title
+
+    # SQL-side increment avoids a read-modify-write race between concurrent sends.
+    # Touching the row also refreshes updated_at through the column's onupdate.
+    result = db.execute(
+        update(GeneralChatSession).where(
+            GeneralChatSession.id == session_id,
+            GeneralChatSession.user_id == user_id
+        ).values(**values).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+
+    # Generated replies are not length-checked upstream: clip them to the column's CHECK limit
+    messages = [
+        {**msg, "content": msg["content"][:GeneralChatMessage.MAX_CONTENT_LENGTH]}
+        for msg in messages
+    ]
+    return db.execute(
+        insert(GeneralChatMessage).returning(
+            GeneralChatMessage.id, GeneralChatMessage.created_at, sort_by_parameter_order=True
+        ),
+        messages
+    ).all()
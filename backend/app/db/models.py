@@ -1,13 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime 
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-import json
 from datetime import datetime, timezone
 
 from sqlalchemy.dialects.postgresql import JSONB
 Base = declarative_base()
 
+
+def utcnow():
+    """Timezone-aware UTC timestamp, filled client-side so no refresh is needed after INSERT"""
+    return datetime.now(timezone.utc)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -56,18 +61,24 @@ class Chat(Base):
     question = Column(String , nullable=True)
     response = Column(String , nullable=True)
     source = Column(JSONB , nullable=True)
-    created_at_question = Column(DateTime, default=func.now() , nullable=True)  # Timestamp for when the question was created
-    created_at_response = Column(DateTime , nullable=True)  # Timestamp for when the response was created
+    created_at_question = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)  # Timestamp for when the question was created
+    created_at_response = Column(DateTime(timezone=True), nullable=True)  # Timestamp for when the response was created
     user_id = Column(Integer, ForeignKey("users.id"))
     uploaded_file_id = Column(Integer, ForeignKey("uploaded_files.id"))
 
     user = relationship("User", back_populates="chats")
     uploaded_file = relationship("UploadedFile", back_populates="chats") 
+
+    # jsonb_path_ops is smaller than the default jsonb_ops and serves @> containment lookups
+    __table_args__ = (
+        Index("ix_chats_source_gin", source, postgresql_using="gin", postgresql_ops={"source": "jsonb_path_ops"}),
+    )
+
     def set_source(self, source):
-        self.source = json.dumps(source)
+        self.source = source
 
     def get_source(self):
-        return json.loads(self.source) if self.source else []
+        return self.source or []
 
 
 class GeneralChatSession(Base):
@@ -75,28 +86,42 @@ class GeneralChatSession(Base):
     __tablename__ = "general_chat_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String, default="New Chat")
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=func.now(), nullable=False)
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)  # Maintained on message insert
     
     user = relationship("User", back_populates="general_chat_sessions")
-    messages = relationship("GeneralChatMessage", back_populates="session", cascade="all, delete-orphan", order_by="GeneralChatMessage.created_at")
+    # Messages are removed by the database (ON DELETE CASCADE) rather than loaded and deleted one by one
+    messages = relationship("GeneralChatMessage", back_populates="session", cascade="all", passive_deletes=True, order_by="GeneralChatMessage.created_at")
+
+    # Serves the per-user session list (filter on user_id, newest first) without a sort step
+    __table_args__ = (
+        Index("ix_gcs_user_updated", user_id, updated_at.desc()),
+    )
 
 
 class GeneralChatMessage(Base):
     """Represents a single message in a general chat session"""
     __tablename__ = "general_chat_messages"
+    MAX_CONTENT_LENGTH = 32768
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("general_chat_sessions.id"), index=True)
-    content = Column(String)
+    session_id = Column(Integer, ForeignKey("general_chat_sessions.id", ondelete="CASCADE"))
+    content = Column(Text)  # Stored uncompressed (STORAGE EXTERNAL), see SCHEMA_UPGRADES
     is_user_message = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
     documents_used = Column(Integer, nullable=True)
     
     session = relationship("GeneralChatSession", back_populates="messages")
 
+    # Serves loading a session's messages in chronological order
+    __table_args__ = (
+        Index("ix_gcm_session_created", session_id, created_at),
+        CheckConstraint(f"length(content) <= {MAX_CONTENT_LENGTH}", name="ck_gcm_content_length"),
+    )
+
     
     
     
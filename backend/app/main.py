@@ -72,6 +72,11 @@ async def startup_event():
             conn.execute(text("SELECT 1"))
         log_info("Database connection established", context="startup")
         
+        # Create tables and apply schema upgrades off the event loop
+        from app.db.database import ensure_tables_created
+        import asyncio
+        await asyncio.to_thread(ensure_tables_created)
+        
         # Preload ML models for faster first request
         log_info("Preloading ML models...", context="startup")
         try:
@@ -104,8 +109,9 @@ async def shutdown_event():
     log_info("Application shutting down", context="shutdown")
     try:
         # Close database connections
-        from app.db.database import engine
+        from app.db.database import engine, async_engine
         engine.dispose()
+        await async_engine.dispose()
         log_info("Database connections closed", context="shutdown")
     except Exception as e:
         log_error(e, context="shutdown")
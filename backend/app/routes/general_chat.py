@@ -2,26 +2,35 @@
 General Chat Sessions API
 Handles CRUD operations for general chat conversations and messages.
 """
-from fastapi import APIRouter, Depends, HTTPException, Body, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, BackgroundTasks
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, desc, tuple_, bindparam, lambda_stmt
+from datetime import datetime, timezone
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import asyncio
+import time
+import orjson
 
-from app.db.models import GeneralChatSession, GeneralChatMessage
-from app.db.database import get_db
+from app.db.models import GeneralChatSession, GeneralChatMessage, utcnow
+from app.db.database import get_async_db, SessionLocal, AsyncSessionLocal
+from app.db.general_chat import save_general_chat_turn
 from app.utils.auth import get_current_user
-from app.services.chat_service import process_general_chat
+from app.services.chat_service import process_general_chat, prepare_general_chat, stream_general_chat
 from app.middleware.error_handler import get_request_id, ValidationException
 from app.utils.logger import log_info, log_error
+from app.utils.cache import (
+    get_redis, cache_get, cache_set, cache_delete, session_list_key, session_events_channel
+)
+from app.config import CACHE_TTL_SESSION_LIST
 
 router = APIRouter()
 
 
 # Pydantic schemas
 class MessageCreate(BaseModel):
-    content: str
+    content: str = Field(..., max_length=GeneralChatMessage.MAX_CONTENT_LENGTH)
     language: str = "Auto-detect"
     model: str = "Mistral"
 
@@ -50,6 +59,55 @@ class SessionResponse(BaseModel):
 
 class SessionWithMessages(SessionResponse):
     messages: List[MessageResponse] = []
+    has_more: bool = False
+
+
+# Columns returned by the read-only endpoints, selected as plain rows
+SESSION_COLUMNS = (
+    GeneralChatSession.id,
+    GeneralChatSession.title,
+    GeneralChatSession.created_at,
+    GeneralChatSession.updated_at,
+    GeneralChatSession.message_count,
+)
+
+MESSAGE_COLUMNS = (
+    GeneralChatMessage.id,
+    GeneralChatMessage.content,
+    GeneralChatMessage.is_user_message,
+    GeneralChatMessage.created_at,
+    GeneralChatMessage.documents_used,
+)
+
+# Rows per round trip when streaming a session's full history
+MESSAGE_FETCH_SIZE = 200
+
+# Messages returned per page by get_session when paginating
+DEFAULT_MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+# Session lookups scoped to the owning user, shared by the handlers. Lambda
+# statements are constructed and cached once instead of rebuilt per request;
+# execute them with owner_params().
+owned_session_stmt = lambda_stmt(lambda: select(GeneralChatSession).where(
+    GeneralChatSession.id == bindparam("session_id"),
+    GeneralChatSession.user_id == bindparam("user_id")
+))
+
+owned_session_row_stmt = lambda_stmt(lambda: select(*SESSION_COLUMNS).where(
+    GeneralChatSession.id == bindparam("session_id"),
+    GeneralChatSession.user_id == bindparam("user_id")
+))
+
+delete_owned_session_stmt = lambda_stmt(lambda: delete(GeneralChatSession).where(
+    GeneralChatSession.id == bindparam("session_id"),
+    GeneralChatSession.user_id == bindparam("user_id")
+))
+
+
+def owner_params(session_id: int, user_id: int) -> dict:
+    """Bind parameters for the owned-session statements"""
+    return {"session_id": session_id, "user_id": user_id}
 
 
 # ============================================================================
@@ -59,33 +117,32 @@ class SessionWithMessages(SessionResponse):
 @router.get("/sessions", response_model=List[SessionResponse])
 async def list_sessions(
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all chat sessions for the current user, ordered by most recent"""
-    sessions = db.query(GeneralChatSession).filter(
-        GeneralChatSession.user_id == user_id
-    ).order_by(desc(GeneralChatSession.updated_at)).all()
-    
-    # Add message count to each session
-    result = []
-    for session in sessions:
-        session_dict = {
-            "id": session.id,
-            "title": session.title,
-            "created_at": session.created_at,
-            "updated_at": session.updated_at,
-            "message_count": len(session.messages)
-        }
-        result.append(session_dict)
+    cache_key = session_list_key(user_id)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        # Already-serialized JSON, returned without decoding
+        return Response(content=cached, media_type="application/json")
     
-    return result
+    # Plain column rows: no ORM objects to hydrate for a read-only listing
+    rows = (await db.execute(
+        select(*SESSION_COLUMNS).where(
+            GeneralChatSession.user_id == user_id
+        ).order_by(desc(GeneralChatSession.updated_at))
+    )).all()
+    
+    response = ORJSONResponse([dict(row._mapping) for row in rows])
+    await cache_set(cache_key, response.body, CACHE_TTL_SESSION_LIST)
+    return response
 
 
 @router.post("/sessions", response_model=SessionResponse)
 async def create_session(
     title: str = Body(default="New Chat", embed=True),
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new chat session"""
     session = GeneralChatSession(
@@ -93,8 +150,8 @@ async def create_session(
         title=title
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await cache_delete(session_list_key(user_id))
     
     log_info(
         f"Created new general chat session",
@@ -115,54 +172,80 @@ async def create_session(
 @router.get("/sessions/{session_id}", response_model=SessionWithMessages)
 async def get_session(
     session_id: int,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_MESSAGE_PAGE_SIZE),
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get a specific session with all its messages"""
-    session = db.query(GeneralChatSession).filter(
-        GeneralChatSession.id == session_id,
-        GeneralChatSession.user_id == user_id
-    ).first()
+    """
+    Get a specific session with its messages, oldest first.
+    Without pagination parameters the full history is returned. With `limit`
+    and/or `before`, only the most recent page is returned: pass the `created_at`
+    and `id` of the oldest loaded message as `before`/`before_id` to page back
+    through the history; `has_more` tells whether older messages remain.
+    """
+    session = (await db.execute(owned_session_row_stmt, owner_params(session_id, user_id))).first()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return {
-        "id": session.id,
-        "title": session.title,
-        "created_at": session.created_at,
-        "updated_at": session.updated_at,
-        "message_count": len(session.messages),
-        "messages": [
-            {
-                "id": msg.id,
-                "content": msg.content,
-                "is_user_message": msg.is_user_message,
-                "created_at": msg.created_at,
-                "documents_used": msg.documents_used
-            }
-            for msg in session.messages
-        ]
-    }
+    stmt = select(*MESSAGE_COLUMNS).where(GeneralChatMessage.session_id == session_id)
+    
+    if before is None and limit is None:
+        # Full history, as clients that don't paginate expect. Server-side cursor:
+        # long sessions are fetched in chunks instead of being buffered whole by the driver
+        result = await db.stream(
+            stmt.order_by(GeneralChatMessage.created_at, GeneralChatMessage.id)
+            .execution_options(yield_per=MESSAGE_FETCH_SIZE)
+        )
+        rows = []
+        async for chunk in result.partitions():
+            rows.extend(chunk)
+        has_more = False
+    else:
+        limit = limit or DEFAULT_MESSAGE_PAGE_SIZE
+        if before is not None:
+            if before.tzinfo is None:
+                # Timestamps are stored in UTC; don't read naive input in the server's zone
+                before = before.replace(tzinfo=timezone.utc)
+            if before_id is not None:
+                # Tie-break on id so rows sharing a timestamp at the page boundary aren't skipped
+                stmt = stmt.where(
+                    tuple_(GeneralChatMessage.created_at, GeneralChatMessage.id) < tuple_(before, before_id)
+                )
+            else:
+                stmt = stmt.where(GeneralChatMessage.created_at < before)
+        
+        # Keyset pagination: a backward range scan on (session_id, created_at),
+        # fetching one extra row to know whether an older page exists
+        rows = (await db.execute(
+            stmt.order_by(desc(GeneralChatMessage.created_at), desc(GeneralChatMessage.id)).limit(limit + 1)
+        )).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+    
+    result = dict(session._mapping)
+    result["messages"] = [dict(msg._mapping) for msg in rows]
+    result["has_more"] = has_more
+    return ORJSONResponse(result)
 
 
 @router.delete("/sessions/{session_id}")
 async def delete_session(
     session_id: int,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a chat session and all its messages"""
-    session = db.query(GeneralChatSession).filter(
-        GeneralChatSession.id == session_id,
-        GeneralChatSession.user_id == user_id
-    ).first()
+    # Single statement: messages are removed by the foreign key's ON DELETE CASCADE
+    result = await db.execute(delete_owned_session_stmt, owner_params(session_id, user_id))
     
-    if not session:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    db.delete(session)
-    db.commit()
+    await db.commit()
+    await cache_delete(session_list_key(user_id))
     
     log_info(
         f"Deleted general chat session",
@@ -179,19 +262,17 @@ async def update_session_title(
     session_id: int,
     title: str = Body(..., embed=True),
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update session title"""
-    session = db.query(GeneralChatSession).filter(
-        GeneralChatSession.id == session_id,
-        GeneralChatSession.user_id == user_id
-    ).first()
+    session = (await db.execute(owned_session_stmt, owner_params(session_id, user_id))).scalar_one_or_none()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     session.title = title
-    db.commit()
+    await db.commit()
+    await cache_delete(session_list_key(user_id))
     
     return {"status": "updated", "title": title}
 
@@ -200,91 +281,427 @@ async def update_session_title(
 # MESSAGE ENDPOINTS
 # ============================================================================
 
+async def _save_turn(db: AsyncSession, session_id: int, user_id: int, messages: List[dict], title: Optional[str] = None):
+    """Save a turn's messages and bump the session counters (see save_general_chat_turn)"""
+    return await db.run_sync(save_general_chat_turn, session_id, user_id, messages, title)
+
+
 @router.post("/sessions/{session_id}/messages")
 async def send_message(
     request: Request,
     session_id: int,
     message: MessageCreate,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message in a session and get AI response"""
     request_id = get_request_id(request)
     
     # Verify session belongs to user
-    session = db.query(GeneralChatSession).filter(
-        GeneralChatSession.id == session_id,
-        GeneralChatSession.user_id == user_id
-    ).first()
+    session = (await db.execute(owned_session_row_stmt, owner_params(session_id, user_id))).first()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Save user message
-    user_message = GeneralChatMessage(
-        session_id=session_id,
-        content=message.content,
-        is_user_message=True
-    )
-    db.add(user_message)
+    # End the read transaction so no pooled connection sits idle in
+    # transaction during generation; the turn is written and committed once
+    # the AI response is back.
+    await db.close()
+    
+    user_message = {
+        "session_id": session_id,
+        "content": message.content,
+        "is_user_message": True,
+        "documents_used": None,
+        "created_at": utcnow()
+    }
     
     # Update session title if it's the first message
-    if session.title == "New Chat" and len(session.messages) == 0:
+    title = None
+    # message_count is maintained with every insert, so no message rows need to be read
+    if session.title == "New Chat" and session.message_count == 0:
         # Use first 50 chars of message as title
-        session.title = message.content[:50] + ("..." if len(message.content) > 50 else "")
-    
-    db.commit()
-    db.refresh(user_message)
+        title = message.content[:50] + ("..." if len(message.content) > 50 else "")
     
     try:
-        # Get AI response using existing general chat logic
-        response = await process_general_chat(
-            question=message.content,
-            excluded_file_ids=[],
-            user_id=user_id,
-            db=db,
-            language=message.language,
-            request_id=request_id
-        )
-        
-        # Save AI response
-        ai_message = GeneralChatMessage(
-            session_id=session_id,
-            content=response.get("message", ""),
-            is_user_message=False,
-            documents_used=len(response.get("documents_used", []))
-        )
-        db.add(ai_message)
-        
-        # Update session timestamp
-        session.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(ai_message)
-        
-        return {
-            "user_message": {
-                "id": user_message.id,
-                "content": user_message.content,
-                "is_user_message": True,
-                "created_at": user_message.created_at
-            },
-            "ai_response": {
-                "id": ai_message.id,
-                "content": ai_message.content,
-                "is_user_message": False,
-                "created_at": ai_message.created_at,
-                "documents_used": ai_message.documents_used
-            }
-        }
-        
+        # Get AI response using existing general chat logic.
+        # The chat service is built on the sync Session, so it gets its own short-lived one.
+        with SessionLocal() as service_db:
+            response = await process_general_chat(
+                question=message.content,
+                excluded_file_ids=[],
+                user_id=user_id,
+                db=service_db,
+                language=message.language,
+                request_id=request_id
+            )
     except Exception as e:
         log_error(e, context="general_chat_message", session_id=session_id)
-        # Still save an error message
-        error_message = GeneralChatMessage(
-            session_id=session_id,
-            content=f"Error: {str(e)}",
-            is_user_message=False
-        )
-        db.add(error_message)
-        db.commit()
+        # Still save the question with an error message
+        error_message = {
+            "session_id": session_id,
+            "content": f"Error: {str(e)}",
+            "is_user_message": False,
+            "documents_used": None,
+            "created_at": utcnow()
+        }
+        await _save_turn(db, session_id, user_id, [user_message, error_message], title)
+        await db.commit()
+        await cache_delete(session_list_key(user_id))
         raise HTTPException(status_code=500, detail=str(e))
+    
+    # Save AI response
+    ai_message = {
+        "session_id": session_id,
+        "content": response.get("message", ""),
+        "is_user_message": False,
+        "documents_used": len(response.get("documents_used", [])),
+        "created_at": utcnow()
+    }
+    rows = await _save_turn(db, session_id, user_id, [user_message, ai_message], title)
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await db.commit()
+    await cache_delete(session_list_key(user_id))
+    
+    (user_message_id, user_created_at), (ai_message_id, ai_created_at) = rows
+    return {
+        "user_message": {
+            "id": user_message_id,
+            "content": user_message["content"],
+            "is_user_message": True,
+            "created_at": user_created_at
+        },
+        "ai_response": {
+            "id": ai_message_id,
+            "content": ai_message["content"],
+            "is_user_message": False,
+            "created_at": ai_created_at,
+            "documents_used": ai_message["documents_used"]
+        }
+    }
+
+
+def _sse(payload: dict) -> bytes:
+    """Encode a server-sent event"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def _save_streamed_turn(session_id: int, user_id: int, messages: List[dict], title: Optional[str]):
+    """
+    Persist a streamed turn with a short-lived session (the request's was closed before streaming).
+    Returns the (id, created_at) rows in message order, or None if the session is gone.
+    """
+    async with AsyncSessionLocal() as db:
+        rows = await _save_turn(db, session_id, user_id, messages, title)
+        if rows is None:
+            # Session was deleted while the response streamed
+            return None
+        await db.commit()
+    await cache_delete(session_list_key(user_id))
+    return rows
+
+
+async def _save_abandoned_question(session_id: int, user_id: int, user_message: dict, turn: dict, title: Optional[str]):
+    """Keep the question when the client went away before the turn was saved"""
+    if turn.get("saved"):
+        return
+    await _save_streamed_turn(session_id, user_id, [user_message], title)
+
+
+@router.post("/sessions/{session_id}/messages/stream")
+async def stream_message(
+    request: Request,
+    session_id: int,
+    message: MessageCreate,
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send a message in a session and stream the AI response as server-sent events.
+    Emits `delta` events with raw text chunks, then a `done` event (or an `error`
+    event). The turn is saved before `done` is sent, and `done` carries the saved
+    messages in the same shape as the POST /messages response.
+    """
+    request_id = get_request_id(request)
+    start_time = time.time()
+    
+    # Verify session belongs to user
+    session = (await db.execute(owned_session_row_stmt, owner_params(session_id, user_id))).first()
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Don't hold a pooled connection while the LLM streams
+    await db.close()
+    
+    # Update session title if it's the first message
+    title = None
+    if session.title == "New Chat" and session.message_count == 0:
+        # Use first 50 chars of message as title
+        title = message.content[:50] + ("..." if len(message.content) > 50 else "")
+    
+    user_message = {
+        "session_id": session_id,
+        "content": message.content,
+        "is_user_message": True,
+        "documents_used": None,
+        "created_at": utcnow()
+    }
+    turn = {}
+    
+    async def save(reply: dict):
+        # Marked first and shielded, so a disconnect mid-save neither drops the
+        # turn nor makes the background task save the question a second time
+        turn["saved"] = True
+        return await asyncio.shield(_save_streamed_turn(session_id, user_id, [user_message, reply], title))
+    
+    async def event_stream():
+        try:
+            # The chat service is built on the sync Session; it is only needed for retrieval
+            with SessionLocal() as service_db:
+                prepared = await prepare_general_chat(
+                    question=message.content,
+                    excluded_file_ids=[],
+                    user_id=user_id,
+                    db=service_db,
+                    request_id=request_id
+                )
+            
+            async for event, data in stream_general_chat(
+                prepared,
+                question=message.content,
+                user_id=user_id,
+                language=message.language,
+                request_id=request_id,
+                start_time=start_time
+            ):
+                if event == "delta":
+                    yield _sse({"type": "delta", "content": data})
+                    continue
+                
+                reply = {
+                    "session_id": session_id,
+                    "content": data["message"],
+                    "is_user_message": False,
+                    "documents_used": len(data["documents_used"]),
+                    "created_at": utcnow()
+                }
+                rows = await save(reply)
+                if rows is None:
+                    yield _sse({"type": "error", "detail": "Session not found"})
+                    return
+                
+                (user_message_id, user_created_at), (ai_message_id, ai_created_at) = rows
+                yield _sse({
+                    "type": "done",
+                    "user_message": {
+                        "id": user_message_id,
+                        "content": user_message["content"],
+                        "is_user_message": True,
+                        "created_at": user_created_at
+                    },
+                    "ai_response": {
+                        "id": ai_message_id,
+                        "content": reply["content"][:GeneralChatMessage.MAX_CONTENT_LENGTH],
+                        "is_user_message": False,
+                        "created_at": ai_created_at,
+                        "documents_used": reply["documents_used"]
+                    }
+                })
+        except Exception as e:
+            log_error(e, context="general_chat_stream", session_id=session_id)
+            if not turn.get("saved"):
+                # Still save the question with an error message
+                try:
+                    await save({
+                        "session_id": session_id,
+                        "content": f"Error: {str(e)}",
+                        "is_user_message": False,
+                        "documents_used": None,
+                        "created_at": utcnow()
+                    })
+                except Exception as save_error:
+                    log_error(save_error, context="general_chat_stream", session_id=session_id)
+            yield _sse({"type": "error", "detail": str(e)})
+    
+    background_tasks.add_task(_save_abandoned_question, session_id, user_id, user_message, turn, title)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# How long an events subscriber waits for a queued reply (matches the Celery task time limit)
+EVENTS_TIMEOUT_SECONDS = 300
+EVENTS_KEEPALIVE_SECONDS = 15
+
+
+@router.post("/sessions/{session_id}/messages/async", status_code=202)
+async def queue_message(
+    request: Request,
+    session_id: int,
+    message: MessageCreate,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Save a message and generate the AI response on a Celery worker.
+    Returns 202 with the task ID; the reply is delivered on
+    GET /sessions/{session_id}/messages/events?task_id=...
+    """
+    request_id = get_request_id(request)
+    
+    # Verify session belongs to user
+    session = (await db.execute(owned_session_row_stmt, owner_params(session_id, user_id))).first()
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Update session title if it's the first message
+    title = None
+    if session.title == "New Chat" and session.message_count == 0:
+        # Use first 50 chars of message as title
+        title = message.content[:50] + ("..." if len(message.content) > 50 else "")
+    
+    user_message = {
+        "session_id": session_id,
+        "content": message.content,
+        "is_user_message": True,
+        "documents_used": None,
+        "created_at": utcnow()
+    }
+    # The question must be committed before the worker reads it
+    rows = await _save_turn(db, session_id, user_id, [user_message], title)
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await db.commit()
+    await cache_delete(session_list_key(user_id))
+    
+    (user_message_id, user_created_at), = rows
+    
+    # Import task here to avoid circular imports
+    from app.tasks.chat_tasks import generate_general_chat_response
+    
+    task = generate_general_chat_response.delay(
+        session_id, user_id, user_message_id, message.language, request_id
+    )
+    
+    log_info(
+        "General chat response queued",
+        context="general_chat_message",
+        session_id=session_id,
+        task_id=task.id,
+        request_id=request_id
+    )
+    
+    return {
+        "task_id": task.id,
+        "user_message": {
+            "id": user_message_id,
+            "content": user_message["content"],
+            "is_user_message": True,
+            "created_at": user_created_at
+        }
+    }
+
+
+@router.get("/sessions/{session_id}/messages/events")
+async def message_events(
+    session_id: int,
+    task_id: str,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Wait for a queued AI response as server-sent events.
+    Emits a single `done` or `error` event for the given task, with `: keep-alive`
+    comments while the worker is still generating.
+    """
+    # Verify session belongs to user
+    session = (await db.execute(owned_session_row_stmt, owner_params(session_id, user_id))).first()
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Don't hold a pooled connection while waiting on the worker
+    await db.close()
+    
+    from app.tasks.chat_tasks import generate_general_chat_response
+    
+    def belongs_to_caller(payload):
+        """Whether a task payload was produced for this task, session and user"""
+        return (
+            isinstance(payload, dict)
+            and payload.get("task_id") == task_id
+            and payload.get("session_id") == session_id
+            and payload.get("user_id") == user_id
+        )
+    
+    def finished_result():
+        """Event payload of an already finished task, or None while it is pending"""
+        result = generate_general_chat_response.AsyncResult(task_id)
+        if not result.ready():
+            return None
+        if not result.successful():
+            # The exception carries no owner to check against, so don't echo it
+            return {"type": "error", "task_id": task_id, "detail": "Response generation failed"}
+        if not belongs_to_caller(result.result):
+            # Task IDs are not secrets: never hand out another session's reply
+            return {"type": "error", "task_id": task_id, "detail": "Task not found"}
+        return result.result
+    
+    async def event_stream():
+        client = get_redis()
+        if client is None:
+            yield _sse({"type": "error", "task_id": task_id, "detail": "Event channel unavailable"})
+            return
+        
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(session_events_channel(session_id))
+            
+            # Subscribe first, then check the result backend, so a task finishing
+            # in between is seen by one or the other
+            payload = await asyncio.to_thread(finished_result)
+            if payload is not None:
+                yield _sse(payload)
+                return
+            
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + EVENTS_TIMEOUT_SECONDS
+            next_keepalive = loop.time() + EVENTS_KEEPALIVE_SECONDS
+            while loop.time() < deadline:
+                event = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if event is None:
+                    if loop.time() >= next_keepalive:
+                        next_keepalive = loop.time() + EVENTS_KEEPALIVE_SECONDS
+                        # A task that died before publishing (hard time limit, failed
+                        # save) only shows up in the result backend
+                        payload = await asyncio.to_thread(finished_result)
+                        if payload is not None:
+                            yield _sse(payload)
+                            return
+                        yield b": keep-alive\n\n"
+                    continue
+                
+                payload = orjson.loads(event["data"])
+                # Skip events for other queued messages of the session
+                if belongs_to_caller(payload):
+                    yield _sse(payload)
+                    return
+            
+            yield _sse({"type": "error", "task_id": task_id, "detail": "Timed out waiting for the response"})
+        except Exception as e:
+            log_error(e, context="general_chat_events", session_id=session_id, task_id=task_id)
+            yield _sse({"type": "error", "task_id": task_id, "detail": str(e)})
+        finally:
+            await pubsub.reset()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -5,6 +5,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.documents import Document
 from langdetect import detect
+from starlette.concurrency import iterate_in_threadpool
 from typing import List
 
 
@@ -264,6 +265,70 @@ def extract_sources_from_context(context: list) -> str:
     
     return "Sources: " + ", ".join(sources_list)
 
+LLM_UNAVAILABLE_MESSAGE = "AI response generation is not available. Please configure GROQ_API_KEY environment variable."
+
+
+def _build_rag_chain(
+    index: str,
+    context: list,
+    memory: list = None,
+    language: str = "Auto-detect",
+):
+    """
+    Build the Input → Prompt → LLM → Output chain answering a question over the given context.
+    Returns None if no LLM is configured.
+    """
+    # Detect language
+    language_names = LANGUAGE_MAP
+    try:
+        detected_lang = detect(context[0].page_content)
+        log_info(
+            f"Language detected: {detected_lang}",
+            context="ai_response",
+            index=index
+        )
+    except Exception as e:
+        detected_lang = "en"
+        log_warning(
+            "Language detection failed, defaulting to English",
+            context="ai_response",
+            index=index,
+            error=str(e)
+        )
+
+    selected_language = language if language != "Auto-detect" else language_names.get(detected_lang, "English")
+
+    prompt_template = custom_prompt_template(selected_language)
+    rag_prompt = ChatPromptTemplate.from_template(prompt_template)
+
+    
+    formatted_memory = format_memory_for_prompt(memory or [])
+
+    # Chain: Input → Prompt → LLM → Output
+    if llm is None:
+        log_error(
+            "LLM not available",
+            context="ai_response",
+            index=index
+        )
+        return None
+
+    # Format context with source information for better LLM understanding
+    # This helps the LLM know which document and page each piece of information comes from
+    formatted_context = format_context_with_sources(context)
+
+    return (
+        {
+            "context": lambda _: formatted_context,
+            "memory": lambda _: formatted_memory,
+            "question": RunnablePassthrough(),
+        }
+        | rag_prompt
+        | llm
+        | StrOutputParser()
+    )
+
+
 async def generate_response(
     index: str,
     question: str,
@@ -286,57 +351,9 @@ async def generate_response(
             memory_length=len(memory) if memory else 0
         )
         
-
-        
-        # Detect language
-        language_names = LANGUAGE_MAP
-        try:
-            detected_lang = detect(context[0].page_content)
-            log_info(
-                f"Language detected: {detected_lang}",
-                context="ai_response",
-                index=index
-            )
-        except Exception as e:
-            detected_lang = "en"
-            log_warning(
-                "Language detection failed, defaulting to English",
-                context="ai_response",
-                index=index,
-                error=str(e)
-            )
-
-        selected_language = language if language != "Auto-detect" else language_names.get(detected_lang, "English")
-
-        prompt_template = custom_prompt_template(selected_language)
-        rag_prompt = ChatPromptTemplate.from_template(prompt_template)
-
-        
-        formatted_memory = format_memory_for_prompt(memory or [])
-
-        # Chain: Input → Prompt → LLM → Output
-        if llm is None:
-            log_error(
-                "LLM not available",
-                context="ai_response",
-                index=index
-            )
-            return "AI response generation is not available. Please configure GROQ_API_KEY environment variable."
-
-        # Format context with source information for better LLM understanding
-        # This helps the LLM know which document and page each piece of information comes from
-        formatted_context = format_context_with_sources(context)
-
-        rag_chain = (
-            {
-                "context": lambda _: formatted_context,
-                "memory": lambda _: formatted_memory,
-                "question": RunnablePassthrough(),
-            }
-            | rag_prompt
-            | llm
-            | StrOutputParser()
-        )
+        rag_chain = _build_rag_chain(index, context, memory=memory, language=language)
+        if rag_chain is None:
+            return LLM_UNAVAILABLE_MESSAGE
 
         response = rag_chain.invoke(question)
         
@@ -372,6 +389,38 @@ async def generate_response(
         return f"Error: {str(e)}"
 
 
+async def generate_response_stream(
+    index: str,
+    question: str,
+    context: list,
+    memory: list = None,
+    language: str = "Auto-detect",
+):
+    """
+    Stream the raw AI response as text chunks while the LLM generates it.
+    Unlike generate_response, chunks are not cleaned and errors are raised:
+    apply clean_response to the joined text once the stream ends.
+    """
+    log_info(
+        "Starting streamed AI response generation",
+        context="ai_response",
+        index=index,
+        question_length=len(question),
+        context_length=len(context),
+        language=language,
+        memory_length=len(memory) if memory else 0
+    )
+
+    rag_chain = _build_rag_chain(index, context, memory=memory, language=language)
+    if rag_chain is None:
+        yield LLM_UNAVAILABLE_MESSAGE
+        return
+
+    # The chain is synchronous: pull each chunk from the threadpool so the event loop stays free
+    async for chunk in iterate_in_threadpool(rag_chain.stream(question)):
+        yield chunk
+
+
 
 
 async def generate_summary(
@@ -1022,6 +1071,243 @@ async def process_chat_request(
         raise DatabaseException("Chat request failed", {"duration": duration})
 
 
+async def prepare_general_chat(
+    question: str,
+    excluded_file_ids: List[int],
+    user_id: int,
+    db: Session,
+    request_id: str = None,
+    include_only_file_ids: List[int] = None
+) -> dict:
+    """
+    Retrieve everything needed to answer a general chat question: context chunks
+    from the user's documents and recent chat history.
+    All database access for a general chat happens here, so callers can release
+    their session before generation starts.
+    """
+    log_info(
+        "General chat request started", 
+        context="process_general_chat", 
+        request_id=request_id, 
+        user_id=user_id,
+        excluded_count=len(excluded_file_ids),
+        include_only=include_only_file_ids is not None
+    )
+    
+    # Get all processed files for the user
+    all_files_query = db.query(UploadedFile).filter(
+        UploadedFile.owner_id == user_id,
+        UploadedFile.embedding_path.isnot(None)  # Only processed files
+    )
+    
+    all_processed_files = all_files_query.all()
+    
+    if not all_processed_files:
+        raise ValidationException(
+            "No processed documents found. Please upload and process documents first.",
+            {"user_id": user_id}
+        )
+    
+    # Filter files based on inclusion/exclusion rules
+    if include_only_file_ids is not None:
+        # Use only specified files (backward compatibility mode)
+        files = [f for f in all_processed_files if f.id in include_only_file_ids]
+        if not files:
+            raise ValidationException(
+                "None of the specified files are available or processed.",
+                {"file_ids": include_only_file_ids, "user_id": user_id}
+            )
+    else:
+        # Use all files except excluded ones
+        files = [f for f in all_processed_files if f.id not in excluded_file_ids]
+        if not files:
+            raise ValidationException(
+                "All documents have been excluded. Please include at least one document.",
+                {"excluded_file_ids": excluded_file_ids, "user_id": user_id}
+            )
+    
+    # Build file ID lists for unified retrieval
+    file_ids_to_include = [f.id for f in files] if include_only_file_ids else None
+    file_ids_to_exclude = excluded_file_ids if not include_only_file_ids else None
+    
+    log_info(
+        f"Using unified retrieval for general chat",
+        context="process_general_chat",
+        request_id=request_id,
+        total_processed=len(all_processed_files),
+        files_available=len(files),
+        include_mode="specific" if file_ids_to_include else "exclude"
+    )
+    
+    # Use new RAG pipeline with multi-stage retrieval for cross-document search
+    try:
+        rag_pipeline = get_rag_pipeline(fast=True)
+        
+        # Modern RAG pipeline with query expansion, hybrid search, and re-ranking
+        all_contexts = await rag_pipeline.retrieve_as_documents(
+            query=question,
+            user_id=user_id,
+            file_ids=file_ids_to_include,
+            exclude_file_ids=file_ids_to_exclude,
+            max_tokens=10000  # Higher token budget for multi-doc context
+        )
+        
+        # Handle case where context is an error string
+        if isinstance(all_contexts, str):
+            # Fall back to legacy retrieval if RAG pipeline fails
+            log_warning(
+                f"RAG pipeline returned error, falling back to legacy: {all_contexts}",
+                context="process_general_chat",
+                user_id=user_id
+            )
+            all_contexts = retrieved_docs_unified(
+                question=question,
+                user_id=user_id,
+                file_ids=file_ids_to_include,
+                exclude_file_ids=file_ids_to_exclude,
+                max_tokens=10000
+            )
+            if isinstance(all_contexts, str):
+                raise FileProcessingException(all_contexts, {"user_id": user_id})
+            
+    except Exception as e:
+        log_error(
+            e,
+            context="process_general_chat",
+            request_id=request_id,
+            user_id=user_id
+        )
+        raise FileProcessingException(
+            f"Failed to retrieve context: {str(e)}",
+            {"user_id": user_id}
+        )
+    
+    if not all_contexts:
+        raise FileProcessingException(
+            "No relevant content found in any of the selected documents.",
+            {"file_count": len(files)}
+        )
+    
+    # Extract unique document names from context metadata for response
+    files_used_ids = set()
+    document_names = []
+    for doc in all_contexts:
+        file_id = doc.metadata.get("file_id")
+        file_name = doc.metadata.get("file_name", "Unknown")
+        if file_id and file_id not in files_used_ids:
+            files_used_ids.add(file_id)
+            # Remove file extension for cleaner display
+            name_without_ext = file_name.rsplit(".", 1)[0] if "." in file_name else file_name
+            document_names.append(name_without_ext)
+    
+    # Get actual file objects for response
+    files_used = [f for f in files if f.id in files_used_ids]
+    
+    log_info(
+        f"Unified retrieval returned {len(all_contexts)} chunks from {len(files_used)} files",
+        context="process_general_chat",
+        request_id=request_id,
+        chunks_retrieved=len(all_contexts),
+        files_used=len(files_used)
+    )
+    
+    # Get message history for general chat (all files)
+    message_history = []
+    try:
+        # Get recent messages from all user files for context
+        all_user_chats = db.query(Chat).filter(
+            Chat.user_id == user_id
+        ).order_by(Chat.created_at_response.desc()).limit(10).all()
+        
+        for chat in reversed(all_user_chats):  # Reverse to get chronological order
+            if chat.question and chat.response:
+                message_history.append({
+                    "role": "user",
+                    "content": chat.question
+                })
+                message_history.append({
+                    "role": "assistant",
+                    "content": chat.response
+                })
+    except Exception as e:
+        log_warning(
+            f"Failed to retrieve message history: {e}",
+            context="process_general_chat",
+            request_id=request_id,
+            user_id=user_id
+        )
+        message_history = []
+    
+    return {
+        # Descriptive index for logging (general chat across multiple documents)
+        "index_name": f"general_chat_{len(document_names)}docs" if document_names else "general",
+        "contexts": all_contexts,
+        "message_history": message_history,
+        "files_used": files_used,
+        "total_documents": len(all_processed_files),
+        "excluded_count": len(excluded_file_ids)
+    }
+
+
+def _validate_general_chat_response(response: str, user_id: int, documents_used: int, request_id: str = None):
+    """Reject empty responses and responses with no text outside HTML tags"""
+    # Validate response is not empty
+    if not response or not response.strip():
+        log_error(
+            "Empty response generated",
+            context="general_chat_response",
+            request_id=request_id,
+            user_id=user_id,
+            documents_used=documents_used
+        )
+        raise FileProcessingException(
+            "Failed to generate a valid response. The AI model returned an empty response. Please try again or rephrase your question.",
+            {"user_id": user_id, "documents_used": documents_used}
+        )
+    
+    # Check if response only contains HTML tags with no actual text content
+    text_only = re.sub(r'<[^>]+>', '', response)
+    text_only = text_only.strip()
+    if not text_only or len(text_only) < 5:
+        log_error(
+            "Response contains only HTML tags with no text content",
+            context="general_chat_response",
+            request_id=request_id,
+            user_id=user_id,
+            response_length=len(response),
+            text_length=len(text_only),
+            documents_used=documents_used
+        )
+        raise FileProcessingException(
+            "Failed to generate a valid response. The AI model returned a response with no meaningful content. Please try again or rephrase your question.",
+            {"user_id": user_id, "documents_used": documents_used}
+        )
+
+
+def _general_chat_result(response: str, prepared: dict, start_time: float, request_id: str = None) -> dict:
+    """Build the general chat response payload from a validated response"""
+    files_used = prepared["files_used"]
+    response_time = datetime.now(timezone.utc)
+    duration = time.time() - start_time
+    
+    log_info(
+        f"General chat completed in {duration:.2f}s",
+        context="process_general_chat",
+        request_id=request_id,
+        documents_used=len(files_used),
+        response_length=len(response)
+    )
+    
+    return {
+        "message": response,
+        "create_at": response_time.isoformat(),
+        "processing_time": f"{duration:.2f}s",
+        "documents_used": [{"id": file.id, "name": file.file_name} for file in files_used],
+        "total_documents": prepared["total_documents"],
+        "excluded_count": prepared["excluded_count"]
+    }
+
+
 async def process_general_chat(
     question: str,
     excluded_file_ids: List[int],
@@ -1046,168 +1332,23 @@ async def process_general_chat(
     """
     start_time = time.time()
     try:
-        log_info(
-            "General chat request started", 
-            context="process_general_chat", 
-            request_id=request_id, 
+        prepared = await prepare_general_chat(
+            question=question,
+            excluded_file_ids=excluded_file_ids,
             user_id=user_id,
-            excluded_count=len(excluded_file_ids),
-            include_only=include_only_file_ids is not None
-        )
-        
-        # Get all processed files for the user
-        all_files_query = db.query(UploadedFile).filter(
-            UploadedFile.owner_id == user_id,
-            UploadedFile.embedding_path.isnot(None)  # Only processed files
-        )
-        
-        all_processed_files = all_files_query.all()
-        
-        if not all_processed_files:
-            raise ValidationException(
-                "No processed documents found. Please upload and process documents first.",
-                {"user_id": user_id}
-            )
-        
-        # Filter files based on inclusion/exclusion rules
-        if include_only_file_ids is not None:
-            # Use only specified files (backward compatibility mode)
-            files = [f for f in all_processed_files if f.id in include_only_file_ids]
-            if not files:
-                raise ValidationException(
-                    "None of the specified files are available or processed.",
-                    {"file_ids": include_only_file_ids, "user_id": user_id}
-                )
-        else:
-            # Use all files except excluded ones
-            files = [f for f in all_processed_files if f.id not in excluded_file_ids]
-            if not files:
-                raise ValidationException(
-                    "All documents have been excluded. Please include at least one document.",
-                    {"excluded_file_ids": excluded_file_ids, "user_id": user_id}
-                )
-        
-        # Build file ID lists for unified retrieval
-        file_ids_to_include = [f.id for f in files] if include_only_file_ids else None
-        file_ids_to_exclude = excluded_file_ids if not include_only_file_ids else None
-        
-        log_info(
-            f"Using unified retrieval for general chat",
-            context="process_general_chat",
-            request_id=request_id,
-            total_processed=len(all_processed_files),
-            files_available=len(files),
-            include_mode="specific" if file_ids_to_include else "exclude"
-        )
-        
-        # Use new RAG pipeline with multi-stage retrieval for cross-document search
-        try:
-            rag_pipeline = get_rag_pipeline(fast=True)
-            
-            # Modern RAG pipeline with query expansion, hybrid search, and re-ranking
-            all_contexts = await rag_pipeline.retrieve_as_documents(
-                query=question,
-                user_id=user_id,
-                file_ids=file_ids_to_include,
-                exclude_file_ids=file_ids_to_exclude,
-                max_tokens=10000  # Higher token budget for multi-doc context
-            )
-            
-            # Handle case where context is an error string
-            if isinstance(all_contexts, str):
-                # Fall back to legacy retrieval if RAG pipeline fails
-                log_warning(
-                    f"RAG pipeline returned error, falling back to legacy: {all_contexts}",
-                    context="process_general_chat",
-                    user_id=user_id
-                )
-                all_contexts = retrieved_docs_unified(
-                    question=question,
-                    user_id=user_id,
-                    file_ids=file_ids_to_include,
-                    exclude_file_ids=file_ids_to_exclude,
-                    max_tokens=10000
-                )
-                if isinstance(all_contexts, str):
-                    raise FileProcessingException(all_contexts, {"user_id": user_id})
-                
-        except Exception as e:
-            log_error(
-                e,
-                context="process_general_chat",
-                request_id=request_id,
-                user_id=user_id
-            )
-            raise FileProcessingException(
-                f"Failed to retrieve context: {str(e)}",
-                {"user_id": user_id}
-            )
-        
-        if not all_contexts:
-            raise FileProcessingException(
-                "No relevant content found in any of the selected documents.",
-                {"file_count": len(files)}
-            )
-        
-        # Extract unique document names from context metadata for response
-        files_used_ids = set()
-        document_names = []
-        for doc in all_contexts:
-            file_id = doc.metadata.get("file_id")
-            file_name = doc.metadata.get("file_name", "Unknown")
-            if file_id and file_id not in files_used_ids:
-                files_used_ids.add(file_id)
-                # Remove file extension for cleaner display
-                name_without_ext = file_name.rsplit(".", 1)[0] if "." in file_name else file_name
-                document_names.append(name_without_ext)
-        
-        # Get actual file objects for response
-        files_used = [f for f in files if f.id in files_used_ids]
-        
-        log_info(
-            f"Unified retrieval returned {len(all_contexts)} chunks from {len(files_used)} files",
-            context="process_general_chat",
+            db=db,
             request_id=request_id,
-            chunks_retrieved=len(all_contexts),
-            files_used=len(files_used)
+            include_only_file_ids=include_only_file_ids
         )
-        
-        # Get message history for general chat (all files)
-        message_history = []
-        try:
-            # Get recent messages from all user files for context
-            all_user_chats = db.query(Chat).filter(
-                Chat.user_id == user_id
-            ).order_by(Chat.created_at_response.desc()).limit(10).all()
-            
-            for chat in reversed(all_user_chats):  # Reverse to get chronological order
-                if chat.question and chat.response:
-                    message_history.append({
-                        "role": "user",
-                        "content": chat.question
-                    })
-                    message_history.append({
-                        "role": "assistant",
-                        "content": chat.response
-                    })
-        except Exception as e:
-            log_warning(
-                f"Failed to retrieve message history: {e}",
-                context="process_general_chat",
-                request_id=request_id,
-                user_id=user_id
-            )
-            message_history = []
+        files_used = prepared["files_used"]
         
         # Generate response using standard generate_response function
         try:
-            # Use descriptive index for logging (general chat across multiple documents)
-            index_name = f"general_chat_{len(document_names)}docs" if document_names else "general"
             response = await generate_response(
-                index=index_name,
+                index=prepared["index_name"],
                 question=question,
-                context=all_contexts,
-                memory=message_history,
+                context=prepared["contexts"],
+                memory=prepared["message_history"],
                 language=language,
                 file_id=None,  # General chat doesn't have a single file_id
                 user_id=user_id
@@ -1218,61 +1359,54 @@ async def process_general_chat(
                 {"file_count": len(files_used)}
             )
         
-        # Validate response is not empty
-        if not response or not response.strip():
-            log_error(
-                "Empty response generated",
-                context="process_general_chat",
-                request_id=request_id,
-                user_id=user_id,
-                documents_used=len(files_used)
-            )
-            raise FileProcessingException(
-                "Failed to generate a valid response. The AI model returned an empty response. Please try again or rephrase your question.",
-                {"user_id": user_id, "documents_used": len(files_used)}
-            )
-        
-        # Check if response only contains HTML tags with no actual text content
-        text_only = re.sub(r'<[^>]+>', '', response)
-        text_only = text_only.strip()
-        if not text_only or len(text_only) < 5:
-            log_error(
-                "Response contains only HTML tags with no text content",
-                context="process_general_chat",
-                request_id=request_id,
-                user_id=user_id,
-                response_length=len(response),
-                text_length=len(text_only),
-                documents_used=len(files_used)
-            )
-            raise FileProcessingException(
-                "Failed to generate a valid response. The AI model returned a response with no meaningful content. Please try again or rephrase your question.",
-                {"user_id": user_id, "documents_used": len(files_used)}
-            )
-        
-        response_time = datetime.now(timezone.utc)
-        duration = time.time() - start_time
-        
-        log_info(
-            f"General chat completed in {duration:.2f}s",
-            context="process_general_chat",
-            request_id=request_id,
-            documents_used=len(files_used),
-            response_length=len(response)
-        )
-        
-        return {
-            "message": response,
-            "create_at": response_time.isoformat(),
-            "processing_time": f"{duration:.2f}s",
-            "documents_used": [{"id": file.id, "name": file.file_name} for file in files_used],
-            "total_documents": len(all_processed_files),
-            "excluded_count": len(excluded_file_ids)
-        }
+        _validate_general_chat_response(response, user_id, len(files_used), request_id=request_id)
+        return _general_chat_result(response, prepared, start_time, request_id=request_id)
         
     except (ValidationException, FileProcessingException, DatabaseException):
         raise
     except Exception as e:
         duration = time.time() - start_time
         log_error(e, context="process_general_chat", request_id=request_id, duration=duration)
-        raise DatabaseException("General chat request failed", {"duration": duration})
\ No newline at end of file
+        raise DatabaseException("General chat request failed", {"duration": duration})
+
+
+async def stream_general_chat(
+    prepared: dict,
+    question: str,
+    user_id: int,
+    language: str = "Auto-detect",
+    request_id: str = None,
+    start_time: float = None
+):
+    """
+    Streaming counterpart of process_general_chat for a request prepared with prepare_general_chat.
+    Yields ("delta", text) events with raw chunks as the LLM generates them, then one
+    ("done", result) event whose result matches process_general_chat's return value,
+    with the cleaned and validated response as its message.
+    Pass time.time() from before prepare_general_chat as start_time so processing_time
+    covers retrieval, as it does for process_general_chat.
+    """
+    if start_time is None:
+        start_time = time.time()
+    files_used = prepared["files_used"]
+    chunks = []
+    try:
+        async for chunk in generate_response_stream(
+            index=prepared["index_name"],
+            question=question,
+            context=prepared["contexts"],
+            memory=prepared["message_history"],
+            language=language
+        ):
+            chunks.append(chunk)
+            yield "delta", chunk
+    except Exception as e:
+        log_error(e, context="stream_general_chat", request_id=request_id, user_id=user_id)
+        raise FileProcessingException(
+            f"Failed to generate response: {str(e)}",
+            {"file_count": len(files_used)}
+        )
+    
+    response = clean_response("".join(chunks))
+    _validate_general_chat_response(response, user_id, len(files_used), request_id=request_id)
+    yield "done", _general_chat_result(response, prepared, start_time, request_id=request_id)
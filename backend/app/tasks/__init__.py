@@ -5,8 +5,10 @@ from app.tasks.document_tasks import (
     process_uploaded_file_task,
     process_pdf_from_url_task
 )
+from app.tasks.chat_tasks import generate_general_chat_response
 
 __all__ = [
     "process_uploaded_file_task",
-    "process_pdf_from_url_task"
+    "process_pdf_from_url_task",
+    "generate_general_chat_response"
 ]
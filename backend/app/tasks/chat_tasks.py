@@ -0,0 +1,118 @@
+"""
+Background tasks for general chat response generation using Celery.
+"""
+import asyncio
+from sqlalchemy import select
+
+from celery_app import celery_app
+from app.db.models import GeneralChatMessage, utcnow
+from app.db.general_chat import save_general_chat_turn
+from app.tasks.document_tasks import DatabaseTask
+from app.utils.logger import log_info, log_error
+from app.utils.cache import cache_delete_sync, publish_json_sync, session_events_channel, session_list_key
+
+
+def _save_reply(db, session_id: int, user_id: int, content: str, documents_used=None):
+    """
+    Save the AI reply to the session and commit.
+    Returns the saved message as a dict, or None if the session is gone.
+    """
+    reply = {
+        "session_id": session_id,
+        "content": content,
+        "is_user_message": False,
+        "documents_used": documents_used,
+        "created_at": utcnow()
+    }
+    rows = save_general_chat_turn(db, session_id, user_id, [reply])
+    if rows is None:
+        db.rollback()
+        return None
+    db.commit()
+
+    (message_id, created_at), = rows
+    return {
+        "id": message_id,
+        "content": reply["content"][:GeneralChatMessage.MAX_CONTENT_LENGTH],
+        "is_user_message": False,
+        # Task results and pub/sub payloads go through JSON
+        "created_at": created_at.isoformat(),
+        "documents_used": documents_used
+    }
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name="app.tasks.chat_tasks.generate_general_chat_response")
+def generate_general_chat_response(
+    self,
+    session_id: int,
+    user_id: int,
+    user_message_id: int,
+    language: str = "Auto-detect",
+    request_id: str = None
+):
+    """
+    Background task to answer a general chat message:
+    - Generate the AI response for the saved user message
+    - Save the reply (or an error message) to the session
+    - Publish a `done`/`error` event on the session's events channel
+
+    The event payload is also the task result, so clients that subscribe
+    after the task finished can read it from the result backend. It carries
+    the session and user IDs so readers can check who the result belongs to.
+    """
+    # Imported here so Celery workers that never run chat tasks don't load the RAG stack
+    from app.services.chat_service import process_general_chat
+
+    db = self.db
+    owner = {"task_id": self.request.id, "session_id": session_id, "user_id": user_id}
+
+    question = db.execute(
+        select(GeneralChatMessage.content).where(
+            GeneralChatMessage.id == user_message_id,
+            GeneralChatMessage.session_id == session_id
+        )
+    ).scalar_one_or_none()
+
+    if question is None:
+        payload = {"type": "error", **owner, "detail": "Message not found"}
+        publish_json_sync(session_events_channel(session_id), payload)
+        return payload
+
+    error = None
+    try:
+        log_info(
+            "Generating general chat response",
+            context="chat_tasks",
+            task_id=owner["task_id"],
+            session_id=session_id,
+            request_id=request_id
+        )
+        response = asyncio.run(process_general_chat(
+            question=question,
+            excluded_file_ids=[],
+            user_id=user_id,
+            db=db,
+            language=language,
+            request_id=request_id
+        ))
+        content = response.get("message", "")
+        documents_used = len(response.get("documents_used", []))
+    except Exception as e:
+        log_error(e, context="chat_tasks", task_id=owner["task_id"], session_id=session_id)
+        db.rollback()
+        error = str(e)
+        # Still save an error message so the turn is complete
+        content = f"Error: {error}"
+        documents_used = None
+
+    reply = _save_reply(db, session_id, user_id, content, documents_used)
+    if reply is None:
+        payload = {"type": "error", **owner, "detail": "Session not found"}
+    elif error is not None:
+        payload = {"type": "error", **owner, "detail": error, "ai_response": reply}
+    else:
+        payload = {"type": "done", **owner, "ai_response": reply}
+
+    cache_delete_sync(session_list_key(user_id))
+    publish_json_sync(session_events_channel(session_id), payload)
+    return payload
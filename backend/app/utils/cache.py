@@ -0,0 +1,115 @@
+"""
+Redis cache and pub/sub helpers.
+Cache errors are logged and treated as misses so Redis never blocks a request.
+The sync helpers are for Celery workers, which have no event loop.
+"""
+
+from typing import Any, Optional
+
+import orjson
+
+from app.config import REDIS_URL, REDIS_PASSWORD
+from app.utils.logger import log_warning
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:
+    redis = None
+    aioredis = None
+
+
+_client = None
+_sync_client = None
+
+
+def get_redis():
+    """Get the shared async Redis client (None if redis is not installed)."""
+    global _client
+    if _client is None and aioredis is not None:
+        _client = aioredis.from_url(
+            REDIS_URL,
+            password=REDIS_PASSWORD,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+    return _client
+
+
+def get_sync_redis():
+    """Get the shared sync Redis client (None if redis is not installed)."""
+    global _sync_client
+    if _sync_client is None and redis is not None:
+        _sync_client = redis.Redis.from_url(
+            REDIS_URL,
+            password=REDIS_PASSWORD,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+    return _sync_client
+
+
+def session_list_key(user_id: int) -> str:
+    """Cache key for a user's general chat session list."""
+    return f"gcs:list:{user_id}"
+
+
+def session_events_channel(session_id: int) -> str:
+    """Pub/sub channel for background events of a general chat session."""
+    return f"gcs:events:{session_id}"
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return the cached bytes, or None on a miss or Redis error."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(key)
+    except Exception as e:
+        log_warning(f"Cache read failed: {e}", context="cache", key=key)
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int) -> None:
+    """Store already-serialized bytes with a TTL in seconds."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl, value)
+    except Exception as e:
+        log_warning(f"Cache write failed: {e}", context="cache", key=key)
+
+
+async def cache_delete(*keys: str) -> None:
+    """Invalidate cached keys."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except Exception as e:
+        log_warning(f"Cache invalidation failed: {e}", context="cache", keys=list(keys))
+
+
+def cache_delete_sync(*keys: str) -> None:
+    """Invalidate cached keys from a sync context."""
+    client = get_sync_redis()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        log_warning(f"Cache invalidation failed: {e}", context="cache", keys=list(keys))
+
+
+def publish_json_sync(channel: str, payload: Any) -> None:
+    """Publish a JSON-serializable payload from a sync context."""
+    client = get_sync_redis()
+    if client is None:
+        return
+    try:
+        client.publish(channel, orjson.dumps(payload))
+    except Exception as e:
+        log_warning(f"Event publish failed: {e}", context="cache", channel=channel)
@@ -1,6 +1,6 @@
 import time
 from langchain_core.runnables import Runnable
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, AIMessageChunk
 from app.utils.observability import get_observability_client, OBSERVABILITY_ENABLED, generate_trace_id
 
 class OpenRouterLLM(Runnable):
@@ -43,6 +43,37 @@ class OpenRouterLLM(Runnable):
             extra_body={}
         )
     
+    def _try_model_stream(self, model, formatted_messages):
+        """Open a streaming completion for a specific model."""
+        return self.client.chat.completions.create(
+            model=model,
+            messages=formatted_messages,
+            temperature=self.temperature,
+            stream=True,
+            extra_body={}
+        )
+    
+    @staticmethod
+    def _is_rate_limit_error(e):
+        """Check if an OpenRouter error is a rate limit (429)."""
+        error_str = str(e)
+        error_dict = {}
+        
+        # Try to extract error details from OpenRouter error format
+        if hasattr(e, 'response') and hasattr(e.response, 'json'):
+            try:
+                error_dict = e.response.json()
+            except:
+                pass
+        
+        return (
+            '429' in error_str or 
+            'Rate limit' in error_str or 
+            'rate limit' in error_str.lower() or
+            (hasattr(e, 'status_code') and e.status_code == 429) or
+            (isinstance(error_dict, dict) and error_dict.get('error', {}).get('code') == 429)
+        )
+    
     def invoke(self, prompt, config=None):
         """Invoke method to work with LangChain chains with automatic fallback"""
         start_time = time.time()
@@ -109,25 +140,10 @@ class OpenRouterLLM(Runnable):
                 # Return an AIMessage object for compatibility
                 return AIMessage(content=completion.choices[0].message.content)
             except Exception as e:
-                error_str = str(e)
-                error_dict = {}
                 error_code = None
                 
-                # Try to extract error details from OpenRouter error format
-                if hasattr(e, 'response') and hasattr(e.response, 'json'):
-                    try:
-                        error_dict = e.response.json()
-                    except:
-                        pass
-                
                 # Check if it's a rate limit error (429)
-                is_rate_limit = (
-                    '429' in error_str or 
-                    'Rate limit' in error_str or 
-                    'rate limit' in error_str.lower() or
-                    (hasattr(e, 'status_code') and e.status_code == 429) or
-                    (isinstance(error_dict, dict) and error_dict.get('error', {}).get('code') == 429)
-                )
+                is_rate_limit = self._is_rate_limit_error(e)
                 
                 if is_rate_limit:
                     error_code = "429"
@@ -197,3 +213,63 @@ class OpenRouterLLM(Runnable):
         
         print(f"Error in OpenRouter LLM invoke: All models failed. Last error: {last_error}")
         raise last_error
+    
+    def stream(self, prompt, config=None, **kwargs):
+        """Stream the completion as AIMessageChunks, falling back on rate limits like invoke.
+        Fallback only happens before the first chunk: rate limits are reported when the request opens."""
+        start_time = time.time()
+        formatted_messages = self._format_messages(prompt)
+        models_to_try = [self.model] + self.fallback_models
+        request_id = ""
+        user_id = 0
+        
+        # Try to extract context from config if available
+        if config and isinstance(config, dict):
+            request_id = config.get("request_id", "")
+            user_id = config.get("user_id", 0)
+        
+        last_error = None
+        
+        for model in models_to_try:
+            try:
+                completion = self._try_model_stream(model, formatted_messages)
+            except Exception as e:
+                last_error = e
+                if self._is_rate_limit_error(e) and model != models_to_try[-1]:
+                    next_model = models_to_try[models_to_try.index(model) + 1]
+                    print(f"⚠ Rate limit exceeded on {model}, automatically switching to fallback: {next_model}")
+                    continue
+                print(f"Error in OpenRouter LLM stream with {model}: {e}")
+                raise
+            
+            for chunk in completion:
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield AIMessageChunk(content=chunk.choices[0].delta.content)
+            
+            if OBSERVABILITY_ENABLED:
+                try:
+                    obs_client = get_observability_client()
+                    obs_client.push_llm_usage(
+                        user_id=user_id,
+                        request_id=request_id,
+                        provider="openrouter",
+                        model=model,
+                        operation="chat_completion_stream",
+                        latency_ms=(time.time() - start_time) * 1000,
+                        success=True,
+                        error_code=None,
+                        error_message=None,
+                        input_tokens=0,
+                        output_tokens=0,
+                        total_tokens=0,
+                        cost_usd=0.0,
+                        fallback_used=model != self.model,
+                        fallback_model=None,
+                        trace_id=generate_trace_id()
+                    )
+                except Exception:
+                    pass  # Never block on observability
+            return
+        
+        print(f"Error in OpenRouter LLM stream: All models failed. Last error: {last_error}")
+        raise last_error
@@ -22,7 +22,7 @@ celery_app = Celery(
     "hcp_backend",
     broker=os.getenv("CELERY_BROKER_URL"),
     backend=os.getenv("CELERY_RESULT_BACKEND"),
-    include=["app.tasks.document_tasks"]
+    include=["app.tasks.document_tasks", "app.tasks.chat_tasks"]
 )
 
 # Setup Celery logging to use structured JSON logger
@@ -421,10 +421,12 @@ celery_app.conf.update(
     task_max_retries=3,  
 )
 
-# Task routing: separate queues for document processing
+# Task routing: separate queues so chat replies never wait behind document processing
 celery_app.conf.task_routes = {
     # Document processing tasks -> documents queue
     "app.tasks.document_tasks.*": {"queue": "documents"},
+    # General chat response generation -> chat queue
+    "app.tasks.chat_tasks.*": {"queue": "chat"},
 }
 
 if __name__ == "__main__":
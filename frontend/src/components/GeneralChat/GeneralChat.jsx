@@ -14,6 +14,7 @@ import { GeneralChatInput } from "./GeneralChatInput";
 // Constants
 const POLL_INTERVAL = 3000; // 3 seconds
 const POLL_TIMEOUT = 120000; // 2 minutes
+const MESSAGE_PAGE_SIZE = 50; // messages fetched per page of session history
 
 function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
   const {
@@ -29,6 +30,8 @@ function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
   const [language, setLanguage] = useState("Auto-detect");
   const [model, setModel] = useState("Mistral");
   const [messages, setMessages] = useState([]);
+  const [hasOlderMessages, setHasOlderMessages] = useState(false);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   const [processing, setProcessing] = useState({});
   const chatEndRef = useRef(null);
@@ -98,8 +101,18 @@ function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
     checkInitialStatuses();
   }, [filesData, filesIsLoading, axiosInstance]);
 
-  // Load messages from session when sessionId changes
+  // Transform API messages to the format expected by the chat component
+  const formatMessages = (apiMessages) => apiMessages.map(msg => ({
+    id: msg.id,
+    message: msg.content,
+    is_user_message: msg.is_user_message,
+    create_at: msg.created_at,
+    documents_used: msg.documents_used
+  }));
+
+  // Load the latest page of messages when sessionId changes
   useEffect(() => {
+    setHasOlderMessages(false);
     if (!sessionId) {
       setMessages([]);
       return;
@@ -108,18 +121,13 @@ function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
     const loadSessionMessages = async () => {
       setIsLoadingMessages(true);
       try {
-        const response = await axiosInstance.get(`/api/general-chat/sessions/${sessionId}`);
+        const response = await axiosInstance.get(`/api/general-chat/sessions/${sessionId}`, {
+          params: { limit: MESSAGE_PAGE_SIZE },
+        });
         const sessionData = response.data;
 
-        // Transform messages to the format expected by the chat component
-        const formattedMessages = sessionData.messages.map(msg => ({
-          message: msg.content,
-          is_user_message: msg.is_user_message,
-          create_at: msg.created_at,
-          documents_used: msg.documents_used
-        }));
-
-        setMessages(formattedMessages);
+        setMessages(formatMessages(sessionData.messages));
+        setHasOlderMessages(Boolean(sessionData.has_more));
       } catch (error) {
         console.error('Failed to load session messages:', error);
         setMessages([]);
@@ -131,6 +139,27 @@ function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
     loadSessionMessages();
   }, [sessionId, axiosInstance]);
 
+  // Prepend the page of messages before the oldest loaded one
+  const loadOlderMessages = async () => {
+    const oldest = messages[0];
+    if (!sessionId || !oldest?.id || isLoadingOlder) return;
+
+    setIsLoadingOlder(true);
+    try {
+      const response = await axiosInstance.get(`/api/general-chat/sessions/${sessionId}`, {
+        params: { limit: MESSAGE_PAGE_SIZE, before: oldest.create_at, before_id: oldest.id },
+      });
+      const sessionData = response.data;
+
+      setMessages((prevMessages) => [...formatMessages(sessionData.messages), ...prevMessages]);
+      setHasOlderMessages(Boolean(sessionData.has_more));
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
   // Fetch files on mount
   useEffect(() => {
     fetchFiles();
@@ -419,6 +448,9 @@ function GeneralChat({ sessionId, onSessionUpdate, onCreateSession }) {
           currentIndex={currentIndex}
           chatEndRef={chatEndRef}
           onSuggestionClick={handleSubmit}
+          hasOlderMessages={hasOlderMessages}
+          isLoadingOlder={isLoadingOlder}
+          onLoadOlder={loadOlderMessages}
         />
 
         {/* Input */}
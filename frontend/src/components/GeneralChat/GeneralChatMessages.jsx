@@ -13,13 +13,30 @@ export const GeneralChatMessages = React.memo(({
   currentIndex,
   chatEndRef,
   onSuggestionClick,
+  hasOlderMessages,
+  isLoadingOlder,
+  onLoadOlder,
 }) => {
+  // Scroll only when a message is appended, not when older history is prepended
+  const lastMessage = messages[messages.length - 1];
   useEffect(() => {
     chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
-  }, [messages, chatEndRef]);
+  }, [lastMessage, chatEndRef]);
 
   return (
     <div className="flex-1 overflow-y-auto p-6 space-y-4" aria-live="polite" aria-label="Chat messages">
+      {hasOlderMessages && (
+        <div className="flex justify-center">
+          <button
+            onClick={onLoadOlder}
+            disabled={isLoadingOlder}
+            className="px-4 py-2 bg-gray-100 hover:bg-gray-200 rounded-full text-sm text-gray-700 transition-colors disabled:opacity-50"
+            aria-label="Load earlier messages"
+          >
+            {isLoadingOlder ? <Loading color="#9ca3af" /> : "Messages précédents"}
+          </button>
+        </div>
+      )}
       {messages.length === 0 ? (
         <div className="flex flex-col items-center justify-center h-full text-center">
           <div className="w-20 h-20 rounded-2xl bg-gradient-to-br from-primary/10 to-primary/5 flex items-center justify-center mb-6">